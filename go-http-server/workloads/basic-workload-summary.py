@@ -6,9 +6,11 @@ from __future__ import annotations
 
 import argparse
 import csv
+import math
 import re
-import statistics
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Sequence
@@ -27,12 +29,53 @@ _THROUGHPUT_SUFFIXES = {
     "g": 1e9,
 }
 
+# Byte-keyed unit tables for scanning raw wrk output (ASCII). Both letter
+# cases are listed because wrk prints e.g. "1.50M", so no per-token
+# normalization is needed.
+_LATENCY_BYTE_SCALE = {
+    spelling.encode(): scale
+    for unit, scale in _LATENCY_UNITS_MS.items()
+    for spelling in (unit, unit.upper())
+}
+_THROUGHPUT_BYTE_SCALE = {
+    spelling.encode(): scale
+    for suffix, scale in _THROUGHPUT_SUFFIXES.items()
+    for spelling in (suffix, suffix.upper())
+}
+
+# Matches the "Latency" and "Req/Sec" rows of wrk's thread stats table,
+# capturing the Avg and Stdev columns with their unit suffixes.
+_METRIC_LINE_RE = re.compile(
+    rb"^[ \t]*(Latency|Req/Sec)[ \t]+([0-9.]+)([a-zA-Z]*)[ \t]+([0-9.]+)([a-zA-Z]*)",
+    re.MULTILINE,
+)
+
+_WORKER_FIELDS = (
+    "worker_id",
+    "latency_avg_ms",
+    "latency_stdev_ms",
+    "req_per_sec_avg",
+    "req_per_sec_stdev",
+    "log_path",
+)
+_METRICS_FIELDS = (
+    "workers",
+    "avg_latency_ms",
+    "latency_stddev_ms",
+    "avg_req_per_sec",
+    "req_per_sec_stddev",
+    "score",
+)
+
 _WORKER_RE = re.compile(r"wrk_client_(\d+)\.log$")
-_SECTION_START_RE = re.compile(r"^===== (.+) START =====$")
-_SECTION_END_RE = re.compile(r"^===== (.+) END =====$")
+_SECTION_MARKER_RE = re.compile(rb"^===== (.+) (START|END) =====$", re.MULTILINE)
 
+# dataclass(slots=True) only exists on Python 3.10+; older interpreters get
+# plain frozen dataclasses so basic-workload.sh keeps working with any python3.
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class WorkerStats:
     worker_id: str
     latency_avg_ms: float
@@ -41,35 +84,33 @@ class WorkerStats:
     req_per_sec_stdev: float
     log_path: Path
 
-    def as_row(self) -> dict[str, str]:
-        return {
-            "worker_id": self.worker_id,
-            "latency_avg_ms": f"{self.latency_avg_ms:.6f}",
-            "latency_stdev_ms": f"{self.latency_stdev_ms:.6f}",
-            "req_per_sec_avg": f"{self.req_per_sec_avg:.6f}",
-            "req_per_sec_stdev": f"{self.req_per_sec_stdev:.6f}",
-            "log_path": str(self.log_path),
-        }
+    def as_tuple(self) -> tuple[str, ...]:
+        return (
+            self.worker_id,
+            f"{self.latency_avg_ms:.6f}",
+            f"{self.latency_stdev_ms:.6f}",
+            f"{self.req_per_sec_avg:.6f}",
+            f"{self.req_per_sec_stdev:.6f}",
+            str(self.log_path),
+        )
 
 
-def _extract_metrics_from_lines(lines: Iterable[str]) -> tuple[float, float, float, float]:
+def _extract_metrics(data: bytes) -> tuple[float, float, float, float]:
     latency_avg_ms = latency_stdev_ms = None
     req_avg = req_stdev = None
 
-    for raw_line in lines:
-        line = raw_line.strip()
-        if line.startswith("Latency"):
-            parts = line.split()
-            if len(parts) < 3:
-                continue
-            latency_avg_ms = parse_latency(parts[1])
-            latency_stdev_ms = parse_latency(parts[2])
-        elif line.startswith("Req/Sec"):
-            parts = line.split()
-            if len(parts) < 3:
-                continue
-            req_avg = parse_throughput(parts[1])
-            req_stdev = parse_throughput(parts[2])
+    for match in _METRIC_LINE_RE.finditer(data):
+        label, avg, avg_unit, stdev, stdev_unit = match.groups()
+        try:
+            if label == b"Latency":
+                latency_avg_ms = float(avg) * _LATENCY_BYTE_SCALE[avg_unit]
+                latency_stdev_ms = float(stdev) * _LATENCY_BYTE_SCALE[stdev_unit]
+            else:
+                req_avg = float(avg) * _THROUGHPUT_BYTE_SCALE[avg_unit]
+                req_stdev = float(stdev) * _THROUGHPUT_BYTE_SCALE[stdev_unit]
+        except (KeyError, ValueError):
+            line = match.group(0).strip().decode("ascii")
+            raise ValueError(f"Unrecognized {label.decode('ascii')} values: {line!r}") from None
 
     missing = [
         name
@@ -87,35 +128,12 @@ def _extract_metrics_from_lines(lines: Iterable[str]) -> tuple[float, float, flo
     return latency_avg_ms, latency_stdev_ms, req_avg, req_stdev
 
 
-def parse_latency(token: str) -> float:
-    match = re.fullmatch(r"([0-9]*\.?[0-9]+)([a-z]+)", token.lower())
-    if not match:
-        raise ValueError(f"Unrecognized latency value: {token!r}")
-    value = float(match.group(1))
-    unit = match.group(2)
-    if unit not in _LATENCY_UNITS_MS:
-        raise ValueError(f"Unsupported latency unit: {token!r}")
-    return value * _LATENCY_UNITS_MS[unit]
-
-
-def parse_throughput(token: str) -> float:
-    match = re.fullmatch(r"([0-9]*\.?[0-9]+)([kmg]?)", token.lower())
-    if not match:
-        raise ValueError(f"Unrecognized throughput value: {token!r}")
-    value = float(match.group(1))
-    suffix = match.group(2)
-    if suffix not in _THROUGHPUT_SUFFIXES:
-        raise ValueError(f"Unsupported throughput suffix: {token!r}")
-    return value * _THROUGHPUT_SUFFIXES[suffix]
-
-
 def parse_wrk_log(path: Path) -> WorkerStats:
     worker_id = _deduce_worker_id(path)
-    with path.open("r", encoding="utf-8") as handle:
-        try:
-            latency_avg_ms, latency_stdev_ms, req_avg, req_stdev = _extract_metrics_from_lines(handle)
-        except ValueError as exc:
-            raise ValueError(f"{path}: {exc}") from exc
+    try:
+        latency_avg_ms, latency_stdev_ms, req_avg, req_stdev = _extract_metrics(path.read_bytes())
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from exc
 
     return WorkerStats(
         worker_id=worker_id,
@@ -135,53 +153,47 @@ def _deduce_worker_id(path: Path) -> str:
 
 
 def parse_aggregated_log(path: Path) -> list[WorkerStats]:
+    data = path.read_bytes()
     stats: list[WorkerStats] = []
     current_name: str | None = None
-    current_lines: list[str] = []
-
-    with path.open("r", encoding="utf-8") as handle:
-        for raw_line in handle:
-            stripped = raw_line.rstrip("\n")
-            start_match = _SECTION_START_RE.match(stripped)
-            if start_match:
-                if current_name is not None:
-                    raise ValueError(
-                        f"{path}: encountered nested section start before closing previous section {current_name!r}"
-                    )
-                current_name = start_match.group(1)
-                current_lines = []
-                continue
-
-            end_match = _SECTION_END_RE.match(stripped)
-            if end_match and current_name is not None:
-                if end_match.group(1) != current_name:
-                    raise ValueError(
-                        f"{path}: section end {end_match.group(1)!r} does not match current section {current_name!r}"
-                    )
-                worker_id = _deduce_worker_id(Path(current_name))
-                try:
-                    latency_avg_ms, latency_stdev_ms, req_avg, req_stdev = _extract_metrics_from_lines(
-                        current_lines
-                    )
-                except ValueError as exc:
-                    raise ValueError(f"{path} [{current_name}]: {exc}") from exc
-
-                stats.append(
-                    WorkerStats(
-                        worker_id=worker_id,
-                        latency_avg_ms=latency_avg_ms,
-                        latency_stdev_ms=latency_stdev_ms,
-                        req_per_sec_avg=req_avg,
-                        req_per_sec_stdev=req_stdev,
-                        log_path=path.parent / current_name,
-                    )
-                )
-                current_name = None
-                current_lines = []
-                continue
+    body_start = 0
 
+    for marker in _SECTION_MARKER_RE.finditer(data):
+        name = marker.group(1).decode("utf-8")
+        if marker.group(2) == b"START":
             if current_name is not None:
-                current_lines.append(raw_line)
+                raise ValueError(
+                    f"{path}: encountered nested section start before closing previous section {current_name!r}"
+                )
+            current_name = name
+            body_start = marker.end()
+            continue
+
+        if current_name is None:
+            continue
+        if name != current_name:
+            raise ValueError(
+                f"{path}: section end {name!r} does not match current section {current_name!r}"
+            )
+        worker_id = _deduce_worker_id(Path(current_name))
+        try:
+            latency_avg_ms, latency_stdev_ms, req_avg, req_stdev = _extract_metrics(
+                data[body_start:marker.start()]
+            )
+        except ValueError as exc:
+            raise ValueError(f"{path} [{current_name}]: {exc}") from exc
+
+        stats.append(
+            WorkerStats(
+                worker_id=worker_id,
+                latency_avg_ms=latency_avg_ms,
+                latency_stdev_ms=latency_stdev_ms,
+                req_per_sec_avg=req_avg,
+                req_per_sec_stdev=req_stdev,
+                log_path=path.parent / current_name,
+            )
+        )
+        current_name = None
 
     if current_name is not None:
         raise ValueError(
@@ -194,7 +206,7 @@ def parse_aggregated_log(path: Path) -> list[WorkerStats]:
     return stats
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class RunMetrics:
     workers: int
     avg_latency_ms: float
@@ -203,44 +215,57 @@ class RunMetrics:
     req_per_sec_stddev: float
     score: float
 
-    def as_row(self) -> dict[str, str]:
-        return {
-            "workers": str(self.workers),
-            "avg_latency_ms": f"{self.avg_latency_ms:.6f}",
-            "latency_stddev_ms": f"{self.latency_stddev_ms:.6f}",
-            "avg_req_per_sec": f"{self.avg_req_per_sec:.6f}",
-            "req_per_sec_stddev": f"{self.req_per_sec_stddev:.6f}",
-            "score": f"{self.score:.6f}",
-        }
+    def as_tuple(self) -> tuple[str, ...]:
+        return (
+            str(self.workers),
+            f"{self.avg_latency_ms:.6f}",
+            f"{self.latency_stddev_ms:.6f}",
+            f"{self.avg_req_per_sec:.6f}",
+            f"{self.req_per_sec_stddev:.6f}",
+            f"{self.score:.6f}",
+        )
 
 
 def write_csv(stats: Iterable[WorkerStats], output_path: Path) -> None:
-    fieldnames = [
-        "worker_id",
-        "latency_avg_ms",
-        "latency_stdev_ms",
-        "req_per_sec_avg",
-        "req_per_sec_stdev",
-        "log_path",
-    ]
     with output_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        for entry in stats:
-            writer.writerow(entry.as_row())
+        writer = csv.writer(handle)
+        writer.writerow(_WORKER_FIELDS)
+        writer.writerows(entry.as_tuple() for entry in stats)
+
+
+class _RunningMoments:
+    # Welford's single-pass mean and population standard deviation. Unlike
+    # E[x^2] - E[x]^2 it does not cancel catastrophically, so identical
+    # values give exactly zero spread.
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def pstdev(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count > 1 else 0.0
 
 
 def compute_run_metrics(stats: Sequence[WorkerStats]) -> RunMetrics:
     if not stats:
         raise ValueError("No worker stats provided for scoring.")
 
-    latency_values = [entry.latency_avg_ms for entry in stats]
-    req_values = [entry.req_per_sec_avg for entry in stats]
+    latency = _RunningMoments()
+    throughput = _RunningMoments()
+    for entry in stats:
+        latency.add(entry.latency_avg_ms)
+        throughput.add(entry.req_per_sec_avg)
 
-    avg_latency_ms = statistics.mean(latency_values)
-    avg_req_per_sec = statistics.mean(req_values)
-    latency_stddev_ms = statistics.pstdev(latency_values) if len(stats) > 1 else 0.0
-    req_stddev = statistics.pstdev(req_values) if len(stats) > 1 else 0.0
+    avg_latency_ms, latency_stddev_ms = latency.mean, latency.pstdev()
+    avg_req_per_sec, req_stddev = throughput.mean, throughput.pstdev()
 
     if avg_latency_ms == 0:
         raise ValueError("Average latency is zero; cannot compute score.")
@@ -258,18 +283,24 @@ def compute_run_metrics(stats: Sequence[WorkerStats]) -> RunMetrics:
 
 
 def write_metrics_csv(metrics: RunMetrics, output_path: Path) -> None:
-    fieldnames = [
-        "workers",
-        "avg_latency_ms",
-        "latency_stddev_ms",
-        "avg_req_per_sec",
-        "req_per_sec_stddev",
-        "score",
-    ]
     with output_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerow(metrics.as_row())
+        writer = csv.writer(handle)
+        writer.writerow(_METRICS_FIELDS)
+        writer.writerow(metrics.as_tuple())
+
+
+def collect_worker_stats(logs_dir: Path) -> list[WorkerStats]:
+    worker_logs = sorted(logs_dir.glob("wrk_client_*.log"))
+    with ThreadPoolExecutor() as executor:
+        stats: list[WorkerStats] = list(executor.map(parse_wrk_log, worker_logs))
+
+    if not stats:
+        # An empty result means neither log layout exists; main reports it.
+        aggregated_log = logs_dir / "basic-workload.log"
+        if aggregated_log.exists():
+            stats = parse_aggregated_log(aggregated_log)
+
+    return stats
 
 
 def main(argv: list[str]) -> int:
@@ -294,33 +325,29 @@ def main(argv: list[str]) -> int:
     args = parser.parse_args(argv)
 
     logs_dir = Path(args.logs_dir)
-    if not logs_dir.exists():
+    try:
+        logs_dir_mode = logs_dir.stat().st_mode
+    except (FileNotFoundError, NotADirectoryError):
         print(f"Logs directory not found: {logs_dir}", file=sys.stderr)
         return 1
-    if not logs_dir.is_dir():
+    if not stat.S_ISDIR(logs_dir_mode):
         print(f"Logs path is not a directory: {logs_dir}", file=sys.stderr)
         return 1
 
-    worker_logs = sorted(logs_dir.glob("wrk_client_*.log"))
-    stats: list[WorkerStats] = [parse_wrk_log(path) for path in worker_logs]
-
+    stats = collect_worker_stats(logs_dir)
     if not stats:
-        aggregated_log = logs_dir / "basic-workload.log"
-        if aggregated_log.exists():
-            stats = parse_aggregated_log(aggregated_log)
-        else:
-            print(
-                f"No wrk_client_*.log files or aggregated basic-workload.log found in {logs_dir}",
-                file=sys.stderr,
-            )
-            return 1
+        print(
+            f"No wrk_client_*.log files or aggregated basic-workload.log found in {logs_dir}",
+            file=sys.stderr,
+        )
+        return 1
 
     output_path = Path(args.output)
     write_csv(stats, output_path)
     print(f"Wrote CSV: {output_path}")
 
-    metrics_output = Path(args.metrics_output)
     metrics = compute_run_metrics(stats)
+    metrics_output = Path(args.metrics_output)
     write_metrics_csv(metrics, metrics_output)
     print(f"Wrote metrics CSV: {metrics_output}")
 
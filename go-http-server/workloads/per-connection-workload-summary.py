@@ -6,14 +6,63 @@ from __future__ import annotations
 
 import argparse
 import csv
-import statistics
+import math
+import os
+import pickle
+import stat
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Sequence
-
-
-@dataclass
+from typing import Sequence
+
+_SUMMARY_PREFIX = "worker_"
+_SUMMARY_SUFFIX = ".summary"
+_SUMMARY_CACHE_NAME = ".summary-cache.pickle"
+# Bump whenever WorkerSummary or the cache layout changes.
+_SUMMARY_CACHE_VERSION = 1
+_SUMMARY_READ_SIZE = 1 << 16
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# csv.writer's default line terminator and the characters that make it quote
+# a field; rows free of them can be joined directly.
+_CSV_LINE_TERMINATOR = "\r\n"
+_CSV_SPECIAL_CHARS = frozenset(',"\r\n')
+
+_WORKER_FIELDS = (
+    "worker_id",
+    "total_requests",
+    "success",
+    "failure",
+    "duration_sec",
+    "throughput_req_per_sec",
+    "latency_avg_ms",
+    "latency_min_ms",
+    "latency_max_ms",
+    "summary_path",
+)
+_METRICS_FIELDS = (
+    "workers",
+    "avg_latency_ms",
+    "latency_stddev_ms",
+    "avg_req_per_sec",
+    "req_per_sec_stddev",
+    "score",
+)
+
+_WORKER_CSV_HEADER = (",".join(_WORKER_FIELDS) + _CSV_LINE_TERMINATOR).encode("ascii")
+_METRICS_CSV_HEADER = (",".join(_METRICS_FIELDS) + _CSV_LINE_TERMINATOR).encode("ascii")
+# One precompiled format spec per worker row, in _WORKER_FIELDS order.
+_WORKER_ROW_FORMAT = "{},{},{},{},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{}" + _CSV_LINE_TERMINATOR
+
+# dataclass(slots=True) only exists on Python 3.10+; older interpreters get
+# plain frozen dataclasses so the workload scripts keep working with any python3.
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class WorkerSummary:
     worker_id: str
     total_requests: int
@@ -24,24 +73,24 @@ class WorkerSummary:
     latency_avg_ms: float
     latency_min_ms: float
     latency_max_ms: float
-    summary_path: Path
-
-    def as_row(self) -> dict[str, str]:
-        return {
-            "worker_id": self.worker_id,
-            "total_requests": str(self.total_requests),
-            "success": str(self.success),
-            "failure": str(self.failure),
-            "duration_sec": f"{self.duration_sec:.6f}",
-            "throughput_req_per_sec": f"{self.throughput_req_per_sec:.6f}",
-            "latency_avg_ms": f"{self.latency_avg_ms:.6f}",
-            "latency_min_ms": f"{self.latency_min_ms:.6f}",
-            "latency_max_ms": f"{self.latency_max_ms:.6f}",
-            "summary_path": str(self.summary_path),
-        }
-
-
-@dataclass
+    summary_path: str
+
+    def as_tuple(self) -> tuple[str, ...]:
+        return (
+            self.worker_id,
+            str(self.total_requests),
+            str(self.success),
+            str(self.failure),
+            f"{self.duration_sec:.6f}",
+            f"{self.throughput_req_per_sec:.6f}",
+            f"{self.latency_avg_ms:.6f}",
+            f"{self.latency_min_ms:.6f}",
+            f"{self.latency_max_ms:.6f}",
+            self.summary_path,
+        )
+
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class RunMetrics:
     workers: int
     avg_latency_ms: float
@@ -50,51 +99,59 @@ class RunMetrics:
     req_per_sec_stddev: float
     score: float
 
-    def as_row(self) -> dict[str, str]:
-        return {
-            "workers": str(self.workers),
-            "avg_latency_ms": f"{self.avg_latency_ms:.6f}",
-            "latency_stddev_ms": f"{self.latency_stddev_ms:.6f}",
-            "avg_req_per_sec": f"{self.avg_req_per_sec:.6f}",
-            "req_per_sec_stddev": f"{self.req_per_sec_stddev:.6f}",
-            "score": f"{self.score:.6f}",
-        }
-
-
-def parse_summary_file(path: Path) -> WorkerSummary:
+    def as_tuple(self) -> tuple[str, ...]:
+        return (
+            str(self.workers),
+            f"{self.avg_latency_ms:.6f}",
+            f"{self.latency_stddev_ms:.6f}",
+            f"{self.avg_req_per_sec:.6f}",
+            f"{self.req_per_sec_stddev:.6f}",
+            f"{self.score:.6f}",
+        )
+
+
+def _read_small_file(path: str) -> bytes:
+    # Summary files are well under one buffer, so this is normally a single
+    # read(2) with no buffered/text I/O layers; larger files keep reading.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = [os.read(fd, _SUMMARY_READ_SIZE)]
+        while len(chunks[-1]) == _SUMMARY_READ_SIZE:
+            chunks.append(os.read(fd, _SUMMARY_READ_SIZE))
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
+
+
+def _positive_ns_to(raw: str, ns_per_unit: float) -> float:
+    # Idle workers report "0"; skip the int() parse for that common value.
+    if raw == "0":
+        return 0.0
+    value = int(raw)
+    return value / ns_per_unit if value > 0 else 0.0
+
+
+def parse_summary_file(path: str) -> WorkerSummary:
     data: dict[str, str] = {}
-    with path.open("r", encoding="utf-8") as handle:
-        for raw_line in handle:
-            line = raw_line.strip()
-            if not line or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            data[key.strip()] = value.strip()
-
-    required_keys = [
-        "success",
-        "failure",
-        "latency_sum_ns",
-        "latency_count",
-        "latency_min_ns",
-        "latency_max_ns",
-        "duration_ns",
-    ]
-    missing = [key for key in required_keys if key not in data]
-    if missing:
-        raise ValueError(f"{path} missing fields: {', '.join(missing)}")
-
-    success = int(data["success"])
-    failure = int(data["failure"])
-    total_requests = success + failure
+    # Lines are machine-written "key=value" pairs with no padding.
+    for line in _read_small_file(path).decode("utf-8").splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            data[key] = value
+
+    try:
+        success = int(data["success"])
+        failure = int(data["failure"])
+        latency_count = int(data["latency_count"])
+        latency_sum_ns = int(data["latency_sum_ns"])
+        latency_min_ms = _positive_ns_to(data["latency_min_ns"], 1e6)
+        latency_max_ms = _positive_ns_to(data["latency_max_ns"], 1e6)
+        duration_sec = _positive_ns_to(data["duration_ns"], 1e9)
+    except KeyError as exc:
+        raise ValueError(f"{path} missing field: {exc.args[0]}") from None
 
-    latency_count = int(data["latency_count"])
-    latency_sum_ns = int(data["latency_sum_ns"])
-    latency_min_ns = int(data["latency_min_ns"])
-    latency_max_ns = int(data["latency_max_ns"])
-    duration_ns = int(data["duration_ns"])
+    total_requests = success + failure
 
-    duration_sec = duration_ns / 1e9 if duration_ns > 0 else 0.0
     throughput_req_per_sec = (
         total_requests / duration_sec if duration_sec > 0 else 0.0
     )
@@ -102,8 +159,6 @@ def parse_summary_file(path: Path) -> WorkerSummary:
     latency_avg_ms = (
         (latency_sum_ns / latency_count) / 1e6 if latency_count > 0 else 0.0
     )
-    latency_min_ms = latency_min_ns / 1e6 if latency_min_ns > 0 else 0.0
-    latency_max_ms = latency_max_ns / 1e6 if latency_max_ns > 0 else 0.0
 
     worker_id = _extract_worker_id(path)
 
@@ -121,72 +176,226 @@ def parse_summary_file(path: Path) -> WorkerSummary:
     )
 
 
-def write_worker_csv(stats: Iterable[WorkerSummary], output_path: Path) -> None:
-    fieldnames = [
-        "worker_id",
-        "total_requests",
-        "success",
-        "failure",
-        "duration_sec",
-        "throughput_req_per_sec",
-        "latency_avg_ms",
-        "latency_min_ms",
-        "latency_max_ms",
-        "summary_path",
-    ]
-    with output_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        for entry in stats:
-            writer.writerow(entry.as_row())
+def _needs_csv_quoting(*values: str) -> bool:
+    return any(not _CSV_SPECIAL_CHARS.isdisjoint(value) for value in values)
+
+
+def _parse_summary_files_uncached(paths: Sequence[str]) -> list[WorkerSummary]:
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        return list(executor.map(parse_summary_file, paths))
+
+
+def parse_summary_files(
+    paths: Sequence[str], cache_path: str | None = None
+) -> list[WorkerSummary]:
+    if cache_path is None:
+        return _parse_summary_files_uncached(paths)
+
+    # Entries are keyed by (path, mtime_ns, size) so edited or rewritten
+    # summaries are re-parsed.
+    cache = _load_summary_cache(cache_path)
+
+    keys = []
+    for path in paths:
+        path_stat = os.stat(path)
+        keys.append((path, path_stat.st_mtime_ns, path_stat.st_size))
+
+    stale = [key for key in keys if key not in cache]
+    cache.update(zip(stale, _parse_summary_files_uncached([key[0] for key in stale])))
+    summaries = [cache[key] for key in keys]
+
+    if stale or len(cache) != len(keys):
+        _write_summary_cache(cache_path, dict(zip(keys, summaries)))
+
+    return summaries
+
+
+def _load_summary_cache(cache_path: str) -> dict[tuple[str, int, int], WorkerSummary]:
+    # Unpickling a damaged file can raise almost anything, and a bad cache
+    # must never fail the run, so it is discarded. Unpickling also runs
+    # arbitrary code, which is why the cache is only read when --cache is
+    # given: the logs directory must be trusted.
+    try:
+        with open(cache_path, "rb") as handle:
+            loaded = pickle.load(handle)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        print(f"Ignoring unreadable summary cache: {cache_path}", file=sys.stderr)
+        return {}
+
+    # Slotted and plain dataclass instances restore from different pickle
+    # state, so a cache written by another python3 loads into garbage
+    # fields; the "slots" tag rejects it along with stale versions.
+    if (
+        isinstance(loaded, dict)
+        and loaded.get("version") == _SUMMARY_CACHE_VERSION
+        and loaded.get("slots") == bool(_DATACLASS_OPTIONS)
+        and isinstance(loaded.get("entries"), dict)
+        and all(type(entry) is WorkerSummary for entry in loaded["entries"].values())
+    ):
+        return loaded["entries"]
+    print(f"Ignoring incompatible summary cache: {cache_path}", file=sys.stderr)
+    return {}
+
+
+def _write_summary_cache(
+    cache_path: str, entries: dict[tuple[str, int, int], WorkerSummary]
+) -> None:
+    # The cache is only an optimization: a read-only or full logs directory
+    # must not fail the run. A unique temp file keeps concurrent runs from
+    # clobbering each other's partial writes before the atomic replace.
+    cache = {
+        "version": _SUMMARY_CACHE_VERSION,
+        "slots": bool(_DATACLASS_OPTIONS),
+        "entries": entries,
+    }
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(cache_path) or ".", delete=False
+        ) as handle:
+            tmp_path = handle.name
+            pickle.dump(cache, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        print(f"Could not write summary cache {cache_path}: {exc}", file=sys.stderr)
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def write_worker_csv(stats: Sequence[WorkerSummary], output_path: str) -> None:
+    if any(_needs_csv_quoting(entry.worker_id, entry.summary_path) for entry in stats):
+        with open(
+            output_path, "w", encoding="utf-8", newline="", buffering=_WRITE_BUFFER_SIZE
+        ) as handle:
+            writer = csv.writer(handle)
+            writer.writerow(_WORKER_FIELDS)
+            writer.writerows(entry.as_tuple() for entry in stats)
+        return
+
+    # Fast path: no field needs quoting, so format rows directly and emit
+    # them as pre-encoded bytes in one write. Matches csv.writer output.
+    _write_worker_rows([_format_worker_row(entry) for entry in stats], output_path)
+
+
+def _format_worker_row(entry: WorkerSummary) -> str:
+    return _WORKER_ROW_FORMAT.format(
+        entry.worker_id,
+        entry.total_requests,
+        entry.success,
+        entry.failure,
+        entry.duration_sec,
+        entry.throughput_req_per_sec,
+        entry.latency_avg_ms,
+        entry.latency_min_ms,
+        entry.latency_max_ms,
+        entry.summary_path,
+    )
+
+
+def _write_worker_rows(rows: list[str], output_path: str) -> None:
+    with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as handle:
+        handle.write(_WORKER_CSV_HEADER)
+        handle.write("".join(rows).encode("utf-8"))
+
+
+class _RunningMoments:
+    # Welford's single-pass mean and population standard deviation. Unlike
+    # E[x^2] - E[x]^2 it does not cancel catastrophically, so identical
+    # values give exactly zero spread.
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def pstdev(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count > 1 else 0.0
+
+
+class _RunAccumulator:
+    # Folds workers into running latency/throughput moments for scoring.
+    __slots__ = ("latency", "throughput")
+
+    def __init__(self) -> None:
+        self.latency = _RunningMoments()
+        self.throughput = _RunningMoments()
+
+    def add(self, entry: WorkerSummary) -> None:
+        self.latency.add(entry.latency_avg_ms)
+        self.throughput.add(entry.throughput_req_per_sec)
+
+    def metrics(self) -> RunMetrics:
+        avg_latency_ms = self.latency.mean
+        avg_req_per_sec = self.throughput.mean
+        if avg_latency_ms == 0:
+            raise ValueError("Average latency is zero; cannot compute score.")
+
+        score = avg_req_per_sec / avg_latency_ms
+
+        return RunMetrics(
+            workers=self.latency.count,
+            avg_latency_ms=avg_latency_ms,
+            latency_stddev_ms=self.latency.pstdev(),
+            avg_req_per_sec=avg_req_per_sec,
+            req_per_sec_stddev=self.throughput.pstdev(),
+            score=score,
+        )
 
 
 def compute_run_metrics(stats: Sequence[WorkerSummary]) -> RunMetrics:
     if not stats:
         raise ValueError("No worker stats provided for scoring.")
 
-    latency_values = [entry.latency_avg_ms for entry in stats]
-    throughput_values = [entry.throughput_req_per_sec for entry in stats]
+    accumulator = _RunAccumulator()
+    for entry in stats:
+        accumulator.add(entry)
+    return accumulator.metrics()
 
-    avg_latency_ms = statistics.mean(latency_values)
-    avg_req_per_sec = statistics.mean(throughput_values)
-    latency_stddev_ms = statistics.pstdev(latency_values) if len(stats) > 1 else 0.0
-    req_stddev = statistics.pstdev(throughput_values) if len(stats) > 1 else 0.0
 
-    if avg_latency_ms == 0:
-        raise ValueError("Average latency is zero; cannot compute score.")
+def write_worker_csv_and_score(stats: Sequence[WorkerSummary], output_path: str) -> RunMetrics:
+    if not stats:
+        raise ValueError("No worker stats provided for scoring.")
+    if any(_needs_csv_quoting(entry.worker_id, entry.summary_path) for entry in stats):
+        write_worker_csv(stats, output_path)
+        return compute_run_metrics(stats)
 
-    score = avg_req_per_sec / avg_latency_ms
+    # Single pass: format each row and fold it into the running moments.
+    accumulator = _RunAccumulator()
+    rows: list[str] = []
+    for entry in stats:
+        rows.append(_format_worker_row(entry))
+        accumulator.add(entry)
 
-    return RunMetrics(
-        workers=len(stats),
-        avg_latency_ms=avg_latency_ms,
-        latency_stddev_ms=latency_stddev_ms,
-        avg_req_per_sec=avg_req_per_sec,
-        req_per_sec_stddev=req_stddev,
-        score=score,
-    )
+    _write_worker_rows(rows, output_path)
+    return accumulator.metrics()
 
 
-def write_metrics_csv(metrics: RunMetrics, output_path: Path) -> None:
-    fieldnames = [
-        "workers",
-        "avg_latency_ms",
-        "latency_stddev_ms",
-        "avg_req_per_sec",
-        "req_per_sec_stddev",
-        "score",
-    ]
-    with output_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerow(metrics.as_row())
-
-
-def _extract_worker_id(path: Path) -> str:
-    name = path.stem
-    if name.startswith("worker_"):
-        return name.split("_", 1)[1]
+def write_metrics_csv(metrics: RunMetrics, output_path: str) -> None:
+    # Every metrics field is numeric, so the row never needs csv quoting.
+    row = ",".join(metrics.as_tuple()) + _CSV_LINE_TERMINATOR
+    with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as handle:
+        handle.write(_METRICS_CSV_HEADER)
+        handle.write(row.encode("ascii"))
+
+
+def _extract_worker_id(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name.startswith(_SUMMARY_PREFIX):
+        return name[len(_SUMMARY_PREFIX):]
     return name
 
 
@@ -209,28 +418,56 @@ def main(argv: list[str]) -> int:
         default="per-connection-workload-metrics.csv",
         help="Run-level metrics CSV output path (default: %(default)s).",
     )
+    parser.add_argument(
+        "--no-metrics",
+        action="store_true",
+        help="Only write the worker CSV; skip run scoring and the metrics CSV.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Reuse parsed summaries from {_SUMMARY_CACHE_NAME} in the logs directory "
+        "for files whose mtime and size are unchanged. The cache is a pickle, "
+        "so only use this on a trusted logs directory.",
+    )
     args = parser.parse_args(argv)
 
-    logs_dir = Path(args.logs_dir)
-    if not logs_dir.exists():
+    # Path() drops "." components and trailing slashes but, unlike
+    # os.path.normpath, keeps ".." so symlinked directories resolve as before.
+    logs_dir = str(Path(args.logs_dir))
+    try:
+        logs_dir_mode = os.stat(logs_dir).st_mode
+    except (FileNotFoundError, NotADirectoryError):
         print(f"Logs directory not found: {logs_dir}", file=sys.stderr)
         return 1
-    if not logs_dir.is_dir():
+    if not stat.S_ISDIR(logs_dir_mode):
         print(f"Logs path is not a directory: {logs_dir}", file=sys.stderr)
         return 1
 
-    summary_files = sorted(logs_dir.glob("worker_*.summary"))
+    with os.scandir(logs_dir) as entries:
+        summary_files = [
+            # Path(".") / name is just name; keep summary_path spelled that way.
+            entry.path if logs_dir != os.curdir else entry.name
+            for entry in entries
+            if entry.name.startswith(_SUMMARY_PREFIX) and entry.name.endswith(_SUMMARY_SUFFIX)
+        ]
+    summary_files.sort()
     if not summary_files:
         print(f"No worker summary files found in {logs_dir}", file=sys.stderr)
         return 1
 
-    worker_stats = [parse_summary_file(path) for path in summary_files]
-    output_path = Path(args.output)
-    write_worker_csv(worker_stats, output_path)
+    cache_path = os.path.join(logs_dir, _SUMMARY_CACHE_NAME) if args.cache else None
+    worker_stats = parse_summary_files(summary_files, cache_path)
+    output_path = args.output
+    if args.no_metrics:
+        write_worker_csv(worker_stats, output_path)
+        print(f"Wrote worker CSV: {output_path}")
+        return 0
+
+    metrics = write_worker_csv_and_score(worker_stats, output_path)
     print(f"Wrote worker CSV: {output_path}")
 
-    metrics_output = Path(args.metrics_output)
-    metrics = compute_run_metrics(worker_stats)
+    metrics_output = args.metrics_output
     write_metrics_csv(metrics, metrics_output)
     print(f"Wrote metrics CSV: {metrics_output}")
 